@@ -1,19 +1,35 @@
 import os
 import sys
 import io
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+import time
+import asyncio
+import hashlib
+import functools
+import tempfile
+import concurrent.futures
+from quart import Quart, request
+from quart_cors import cors
 import google.generativeai as genai
-from PyPDF2 import PdfReader
+import orjson
 from dotenv import load_dotenv
-import requests
+
+# Prefer PyMuPDF (fastest), fall back to pypdf if its AGPL license is a blocker
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+    from pypdf import PdfReader
+import httpx
 from pathlib import Path
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for Next.js frontend
+app = Quart(__name__)
+app = cors(app)  # Enable CORS for Next.js frontend
+# Responses we build use orjson (already compact); keep any
+# framework-generated JSON compact too
+app.json.compact = True
 
 # Configure Gemini API
 API_KEY = os.getenv("GOOGLE_GEMINI_KEY")
@@ -23,83 +39,292 @@ if not API_KEY:
 
 genai.configure(api_key=API_KEY)
 
-def get_model_with_config(max_tokens=8192, temperature=0.7):
-    """Create a model with custom configuration"""
+def json_response(obj, status=200):
+    """Build a JSON response with orjson (much faster than stdlib json)"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype="application/json")
+
+class SummaryCache:
+    """
+    Small in-process cache with TTL, keyed by content hash
+
+    Avoids re-running PDF extraction and expensive Gemini calls when the
+    same document is submitted again.
+    """
+    def __init__(self, ttl=3600, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._store = {}
+
+    def get(self, key):
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._store[key]
+            return None
+        return value
+
+    def set(self, key, value):
+        # Drop expired (then oldest) entries to keep memory bounded
+        if len(self._store) >= self.max_entries:
+            now = time.monotonic()
+            for k in [k for k, (exp, _) in self._store.items() if exp < now]:
+                del self._store[k]
+            while len(self._store) >= self.max_entries:
+                del self._store[next(iter(self._store))]
+        self._store[key] = (time.monotonic() + self.ttl, value)
+
+# pdf sha256 -> extracted text (style/language changes skip re-parsing)
+text_cache = SummaryCache()
+# pdf sha256 + prompt params -> generated summary
+summary_cache = SummaryCache()
+# url -> {etag, last_modified, sha256} for conditional re-downloads
+url_cache = SummaryCache(ttl=86400)
+
+# Upper bound on accepted PDF size (bytes)
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", 50 * 1024 * 1024))
+
+# Bound concurrent Gemini calls so bursts (map-reduce fanout included)
+# stay under the API rate tier instead of thrashing on 429 retries
+GEMINI_MAX_INFLIGHT = int(os.getenv("GEMINI_MAX_INFLIGHT", 8))
+_gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_INFLIGHT)
+
+async def generate_limited(model, prompt, **kwargs):
+    """generate_content_async gated by the in-flight semaphore"""
+    async with _gemini_semaphore:
+        return await model.generate_content_async(prompt, **kwargs)
+
+# Schema for structured summaries: Gemini emits this JSON directly, so no
+# second call or client-side parsing is needed
+_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["title", "summary", "key_points"],
+}
+
+@functools.lru_cache(maxsize=32)
+def get_model_with_config(max_tokens=8192, temperature=0.7, structured=False):
+    """Create a model with custom configuration (memoized per config)"""
+    generation_config = {
+        "temperature": temperature,
+        "top_p": 0.95,
+        "max_output_tokens": max_tokens,
+    }
+    if structured:
+        generation_config["response_mime_type"] = "application/json"
+        generation_config["response_schema"] = _SUMMARY_SCHEMA
     return genai.GenerativeModel(
         "gemini-2.0-flash",
-        generation_config={
-            "temperature": temperature,
-            "top_p": 0.95,
-            "max_output_tokens": max_tokens,
-        }
+        generation_config=generation_config
+    )
+
+# Text-only extraction: skip image info and ligature expansion so
+# graphics-heavy pages don't pay for operators that produce no text
+_TEXT_FLAGS = (fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES) if fitz is not None else 0
+
+# PDFs with at least this many pages are extracted in parallel
+_PARALLEL_PAGE_THRESHOLD = 50
+_extract_pool = None
+
+def _get_extract_pool():
+    """Lazily create the shared process pool for parallel extraction"""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _extract_pool
+
+def _extract_page_range(data, start, end):
+    """Worker: extract text from pages [start, end) of a PDF given as bytes"""
+    if fitz is not None:
+        doc = fitz.open(stream=data, filetype="pdf")
+        try:
+            return "\n".join(
+                doc[i].get_text("text", flags=_TEXT_FLAGS)
+                for i in range(start, end)
+            )
+        finally:
+            doc.close()
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(
+        page_text for i in range(start, end)
+        if (page_text := reader.pages[i].extract_text())
     )
 
 def extract_text_from_pdf(file_or_bytes):
     """
     Extract text from PDF file or bytes
-    
+
+    Large documents are split into page ranges extracted by a process
+    pool, sidestepping the GIL for the CPU-heavy parsing.
+
     Args:
         file_or_bytes: File path, file object, or bytes
-        
+
     Returns:
         str: Extracted text
     """
     try:
-        reader = PdfReader(file_or_bytes)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text
+        # Normalize to bytes so workers can reopen the document themselves
+        if isinstance(file_or_bytes, (bytes, bytearray)):
+            data = bytes(file_or_bytes)
+        elif hasattr(file_or_bytes, 'read'):
+            data = file_or_bytes.read()
+        else:
+            data = Path(file_or_bytes).read_bytes()
+
+        if fitz is not None:
+            # PyMuPDF parses in C, much faster than pure-Python parsers
+            doc = fitz.open(stream=data, filetype="pdf")
+            page_count = doc.page_count
+            doc.close()
+        else:
+            # pypdf fallback: same API as the old PyPDF2 but maintained
+            page_count = len(PdfReader(io.BytesIO(data)).pages)
+
+        workers = os.cpu_count() or 1
+        if page_count >= _PARALLEL_PAGE_THRESHOLD and workers > 1:
+            step = -(-page_count // workers)  # ceil division
+            ranges = [(s, min(s + step, page_count)) for s in range(0, page_count, step)]
+            parts = _get_extract_pool().map(
+                _extract_page_range,
+                [data] * len(ranges),
+                [r[0] for r in ranges],
+                [r[1] for r in ranges],
+            )
+            return "\n".join(parts)
+
+        return _extract_page_range(data, 0, page_count)
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
 
-def download_pdf_from_url(url):
-    """Download PDF from URL and return bytes"""
+async def download_pdf_from_url(url):
+    """
+    Download PDF from URL
+
+    Sends If-None-Match/If-Modified-Since when the URL was fetched before;
+    on 304 Not Modified no body is transferred and callers can reuse the
+    cached extraction/summary.
+
+    Returns:
+        tuple: (file object or None on 304, sha256 of the PDF bytes)
+    """
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        # Check if it's actually a PDF
-        content_type = response.headers.get('content-type', '')
-        if 'pdf' not in content_type.lower():
-            # Try anyway, might still be a PDF
-            pass
-        
-        return io.BytesIO(response.content)
+        # Only ask for a conditional response while the cached extraction
+        # for the previous body is still alive
+        headers = {}
+        known = url_cache.get(url)
+        if known and text_cache.get(known['sha256']) is not None:
+            if known.get('etag'):
+                headers['If-None-Match'] = known['etag']
+            if known.get('last_modified'):
+                headers['If-Modified-Since'] = known['last_modified']
+
+        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+            # Cheap HEAD first: reject non-PDF or oversized URLs before
+            # transferring any body. Servers that reject HEAD are let
+            # through; the streamed byte counter below still bounds them.
+            try:
+                head = await client.head(url, timeout=5)
+                if head.status_code < 400:
+                    content_type = head.headers.get('content-type', '')
+                    if 'pdf' not in content_type.lower() and not url.lower().endswith('.pdf'):
+                        raise ValueError(f"URL does not point to a PDF (content-type: {content_type})")
+                    content_length = int(head.headers.get('content-length', '0'))
+                    if content_length > MAX_PDF_BYTES:
+                        raise ValueError(f"PDF is too large ({content_length} bytes, limit {MAX_PDF_BYTES})")
+            except httpx.HTTPError:
+                pass
+
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304:
+                    print("⚡ URL not modified, reusing cached document")
+                    return None, known['sha256']
+                response.raise_for_status()
+
+                # Stream in 64 KB chunks into a spooled file so only one chunk
+                # is in memory at a time; large PDFs spill to disk automatically
+                tmp = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+                hasher = hashlib.sha256()
+                total_bytes = 0
+                async for chunk in response.aiter_bytes(chunk_size=65536):
+                    total_bytes += len(chunk)
+                    if total_bytes > MAX_PDF_BYTES:
+                        # Content-Length can lie or be absent; abort mid-stream
+                        raise ValueError(f"PDF is too large (over {MAX_PDF_BYTES} bytes)")
+                    tmp.write(chunk)
+                    hasher.update(chunk)
+                tmp.seek(0)
+
+                pdf_hash = hasher.hexdigest()
+                url_cache.set(url, {
+                    'etag': response.headers.get('etag'),
+                    'last_modified': response.headers.get('last-modified'),
+                    'sha256': pdf_hash,
+                })
+                return tmp, pdf_hash
+    except ValueError:
+        # Client errors (non-PDF URL, oversized document) map to 400
+        raise
     except Exception as e:
         raise Exception(f"Error downloading PDF: {str(e)}")
 
-def create_summary_prompt(text, max_chars=50000, summary_style="comprehensive", output_language="auto"):
+def split_text_into_chunks(text, chunk_chars=30000):
     """
-    Create optimized prompt based on token limits and language preference
-    
+    Split text into chunks on paragraph boundaries
+
+    Chunks are yielded lazily so callers never hold every chunk copy in
+    memory at once alongside the original text.
+
     Args:
-        text: Text to summarize
-        max_chars: Maximum characters to include
-        summary_style: Style of summary (comprehensive, concise, bullet)
-        output_language: Output language (auto, english, indonesian)
+        text: Text to split
+        chunk_chars: Target maximum characters per chunk (~8k tokens)
+
+    Yields:
+        str: Text chunks in document order
     """
-    # Truncate if needed
-    if len(text) > max_chars:
-        text = text[:max_chars]
-    
-    # Language instruction based on preference
-    language_instruction = ""
-    if output_language == "english":
-        language_instruction = "IMPORTANT: Provide the summary in ENGLISH, regardless of the input document's language."
-    elif output_language == "indonesian":
-        language_instruction = "IMPORTANT: Provide the summary in INDONESIAN (Bahasa Indonesia), regardless of the input document's language."
-    else:  # auto
-        language_instruction = "Provide the summary in the same language as the input document."
-    
-    # Different prompt templates based on style
-    if summary_style == "concise":
-        prompt = f"""
+    if len(text) <= chunk_chars:
+        yield text
+        return
+
+    current = []
+    current_len = 0
+    for paragraph in text.split("\n\n"):
+        # +2 accounts for the paragraph separator we re-add on join
+        if current and current_len + len(paragraph) + 2 > chunk_chars:
+            yield "\n\n".join(current)
+            current = []
+            current_len = 0
+        current.append(paragraph)
+        current_len += len(paragraph) + 2
+    if current:
+        yield "\n\n".join(current)
+
+# Prompt templates are built once at import; per-request work is a dict
+# lookup plus one .format() call
+_MAP_TEMPLATE = """
+Extract the key points from this section of a larger document.
+
+Requirements:
+- Capture all important facts, arguments, and conclusions
+- Keep the original language of the text
+- Be factual and neutral; do not add commentary
+- Write dense notes, not a polished summary
+
+Section:
+{text}
+"""
+
+_SUMMARY_TEMPLATES = {
+    "concise": """
 Provide a CONCISE summary of this document.
 
-{language_instruction}
+{lang}
 
 Requirements:
 - Keep it brief but informative
@@ -109,12 +334,11 @@ Requirements:
 
 Document:
 {text}
-"""
-    elif summary_style == "bullet":
-        prompt = f"""
+""",
+    "bullet": """
 Summarize this document using bullet points.
 
-{language_instruction}
+{lang}
 
 Requirements:
 - Use bullet point format
@@ -124,12 +348,11 @@ Requirements:
 
 Document:
 {text}
-"""
-    else:  # comprehensive
-        prompt = f"""
+""",
+    "comprehensive": """
 Provide a COMPREHENSIVE yet CONCISE summary of this document.
 
-{language_instruction}
+{lang}
 
 Requirements:
 - Use clear, well-structured paragraphs
@@ -140,117 +363,283 @@ Requirements:
 
 Document:
 {text}
-"""
-    
-    return prompt
+""",
+}
+
+_LANGUAGE_INSTRUCTIONS = {
+    "english": "IMPORTANT: Provide the summary in ENGLISH, regardless of the input document's language.",
+    "indonesian": "IMPORTANT: Provide the summary in INDONESIAN (Bahasa Indonesia), regardless of the input document's language.",
+    "auto": "Provide the summary in the same language as the input document.",
+}
+
+def create_map_prompt(chunk):
+    """Create a neutral note-taking prompt for one chunk of a long document"""
+    return _MAP_TEMPLATE.format(text=chunk)
 
-def summarize_text(text, max_tokens=8192, temperature=0.7, summary_style="comprehensive", output_language="auto"):
+# Input token budget for the final summarization prompt
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", 100000))
+
+async def truncate_to_token_budget(model, text, max_input_tokens=MAX_INPUT_TOKENS):
+    """
+    Trim text to the model's real token budget
+
+    Characters are a poor proxy for tokens (~4 chars/token in English,
+    ~1 in CJK), so a character cap either wastes context or overflows it.
+    Count tokens via the API and cut proportionally, re-checking until
+    the text fits; this converges in one or two extra calls.
+    """
+    try:
+        total = (await model.count_tokens_async(text)).total_tokens
+        while total > max_input_tokens:
+            # Cut slightly below the proportional estimate to converge fast
+            keep = int(len(text) * max_input_tokens / total * 0.98)
+            text = text[:keep]
+            total = (await model.count_tokens_async(text)).total_tokens
+        return text
+    except Exception as e:
+        # Counting failed; fall back to the old character cap
+        print(f"⚠️ Token counting failed ({e}), using character cap")
+        return text[:50000]
+
+def create_summary_prompt(text, summary_style="comprehensive", output_language="auto"):
+    """
+    Create optimized prompt based on style and language preference
+
+    Args:
+        text: Text to summarize (already trimmed to the token budget)
+        summary_style: Style of summary (comprehensive, concise, bullet)
+        output_language: Output language (auto, english, indonesian)
+    """
+    language_instruction = _LANGUAGE_INSTRUCTIONS.get(output_language, _LANGUAGE_INSTRUCTIONS["auto"])
+    template = _SUMMARY_TEMPLATES.get(summary_style, _SUMMARY_TEMPLATES["comprehensive"])
+    return template.format(lang=language_instruction, text=text)
+
+async def map_document_to_notes(model, text):
+    """
+    Map step of map-reduce: condense chunks of a long document into
+    neutral notes with concurrent Gemini calls, so wall time is
+    max(chunk) instead of sum(chunks)
+
+    Returns the text unchanged when it fits in a single chunk.
+    """
+    chunk_iter = split_text_into_chunks(text)
+    first_chunk = next(chunk_iter)
+    if len(first_chunk) >= len(text):
+        return text
+
+    print("🗂️ Long document: map-reduce over chunks")
+    responses = await asyncio.gather(
+        generate_limited(model, create_map_prompt(first_chunk)),
+        *[generate_limited(model, create_map_prompt(chunk))
+          for chunk in chunk_iter]
+    )
+    return "\n\n".join(r.text for r in responses if r and r.text)
+
+async def summarize_text(text, max_tokens=8192, temperature=0.7, summary_style="comprehensive", output_language="auto", structured=False):
     """
     Generate summary with customizable parameters
-    
+
     Args:
         text: Text to summarize
         max_tokens: Maximum output tokens
         temperature: Model temperature (0.0-1.0)
         summary_style: Style of summary
         output_language: Output language (auto, english, indonesian)
-        
+        structured: Return a dict matching _SUMMARY_SCHEMA instead of text
+
     Returns:
-        str: Generated summary
+        str or dict: Generated summary
     """
     # Create model with specified config
     model = get_model_with_config(max_tokens, temperature)
-    
-    # Create optimized prompt with language preference
-    prompt = create_summary_prompt(text, summary_style=summary_style, output_language=output_language)
-    
+
     try:
-        response = model.generate_content(prompt)
-        
+        text = await map_document_to_notes(model, text)
+        text = await truncate_to_token_budget(model, text)
+
+        # Reduce step (or the only step for short documents): apply the
+        # requested style and language to the full content
+        prompt = create_summary_prompt(text, summary_style=summary_style, output_language=output_language)
+
+        # Awaitable Gemini call: the worker can serve other requests while
+        # this one waits on the API. With structured output the model
+        # emits schema-conforming JSON directly.
+        reduce_model = get_model_with_config(max_tokens, temperature, structured=True) if structured else model
+        response = await generate_limited(reduce_model, prompt)
+
         if not response or not response.text:
             raise Exception("No response generated from API")
-        
+
+        if structured:
+            return orjson.loads(response.text)
         return response.text
     except Exception as e:
         raise Exception(f"Error generating summary: {str(e)}")
 
+async def stream_summary_text(text, max_tokens=8192, temperature=0.7, summary_style="comprehensive", output_language="auto"):
+    """
+    Generate a summary as an async stream of text pieces
+
+    Same map-reduce pipeline as summarize_text, but the final Gemini call
+    streams its output so the client sees text as it is produced instead
+    of waiting for the complete response.
+    """
+    model = get_model_with_config(max_tokens, temperature)
+
+    text = await map_document_to_notes(model, text)
+    text = await truncate_to_token_budget(model, text)
+    prompt = create_summary_prompt(text, summary_style=summary_style, output_language=output_language)
+
+    response = await generate_limited(model, prompt, stream=True)
+    async for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+def validate_summary_params(max_tokens, temperature, output_language):
+    """Return an error message for out-of-range parameters, or None"""
+    if max_tokens < 256 or max_tokens > 8192:
+        return "max_tokens must be between 256 and 8192"
+    if temperature < 0.0 or temperature > 1.0:
+        return "temperature must be between 0.0 and 1.0"
+    if output_language not in ['auto', 'english', 'indonesian']:
+        return "output_language must be 'auto', 'english', or 'indonesian'"
+    return None
+
+async def get_pdf_text_from_request(form, files):
+    """
+    Resolve the request's PDF source (URL or upload) to extracted text
+
+    Serves the extraction from cache when the same document was seen
+    before.
+
+    Raises:
+        ValueError: For client errors (bad upload, no source given)
+
+    Returns:
+        tuple: (pdf_text, pdf_hash)
+    """
+    pdf_url = form.get('pdf_url', '')
+    pdf_file = None
+    pdf_hash = None
+
+    # Check if URL is provided
+    if pdf_url:
+        print(f"📥 Downloading PDF from URL: {pdf_url}")
+        pdf_file, pdf_hash = await download_pdf_from_url(pdf_url)
+
+    # Check if file is uploaded
+    elif 'file' in files:
+        file = files['file']
+        if file.filename == '':
+            raise ValueError("No file selected")
+
+        if not file.filename.lower().endswith('.pdf'):
+            raise ValueError("File must be a PDF")
+
+        # Read the upload once into a contiguous buffer; magic-byte check,
+        # hashing, and extraction all work on it without re-reading the
+        # spooled temp file in small chunks
+        file.seek(0)
+        data = file.read()
+
+        if len(data) > MAX_PDF_BYTES:
+            raise ValueError(f"PDF is too large ({len(data)} bytes, limit {MAX_PDF_BYTES})")
+
+        # PDF files must start with "%PDF-" (magic bytes)
+        if not data.startswith(b'%PDF-'):
+            raise ValueError("Invalid PDF file. This may be a renamed file.")
+
+        print(f"📄 Processing uploaded file: {file.filename}")
+        pdf_file = data
+
+    else:
+        raise ValueError("No PDF file or URL provided")
+
+    # Cache lookups are keyed by document content, so re-submitting the
+    # same PDF skips extraction entirely. URL downloads hash while
+    # streaming; uploads are hashed here from the in-memory buffer.
+    if pdf_hash is None:
+        pdf_hash = hashlib.sha256(pdf_file).hexdigest()
+
+    pdf_text = text_cache.get(pdf_hash)
+    if pdf_text is None:
+        if pdf_file is None:
+            # Cached extraction expired after the 304; fetch the body
+            pdf_file, pdf_hash = await download_pdf_from_url(pdf_url)
+        # Extraction is CPU-bound; run it off the event loop
+        pdf_text = await asyncio.to_thread(extract_text_from_pdf, pdf_file)
+        text_cache.set(pdf_hash, pdf_text)
+
+    if not pdf_text or not pdf_text.strip():
+        raise ValueError("Could not extract text from PDF")
+
+    return pdf_text, pdf_hash
+
 @app.route('/api/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "ok", "message": "Backend is running"})
+    return json_response({"status": "ok", "message": "Backend is running"})
 
 @app.route('/api/summarize', methods=['POST'])
-def summarize():
+async def summarize():
     """
     Main endpoint to summarize PDF
     Accepts: file upload or PDF URL
     """
     try:
         # Get parameters
-        max_tokens = int(request.form.get('max_tokens', 8192))
-        temperature = float(request.form.get('temperature', 0.7))
-        summary_style = request.form.get('summary_style', 'comprehensive')
-        output_language = request.form.get('output_language', 'auto')
-        pdf_url = request.form.get('pdf_url', '')
-        
+        form = await request.form
+        files = await request.files
+        max_tokens = int(form.get('max_tokens', 8192))
+        temperature = float(form.get('temperature', 0.7))
+        summary_style = form.get('summary_style', 'comprehensive')
+        output_language = form.get('output_language', 'auto')
+        # Opt-in structured output: summary becomes a JSON object with
+        # title, summary, and key_points fields
+        structured = form.get('structured', 'false').lower() in ('1', 'true', 'yes')
+
         # Validate parameters
-        if max_tokens < 256 or max_tokens > 8192:
-            return jsonify({"error": "max_tokens must be between 256 and 8192"}), 400
-        
-        if temperature < 0.0 or temperature > 1.0:
-            return jsonify({"error": "temperature must be between 0.0 and 1.0"}), 400
-        
-        if output_language not in ['auto', 'english', 'indonesian']:
-            return jsonify({"error": "output_language must be 'auto', 'english', or 'indonesian'"}), 400
-        
-        # Get PDF content
-        pdf_text = None
-        
-        # Check if URL is provided
-        if pdf_url:
-            print(f"📥 Downloading PDF from URL: {pdf_url}")
-            pdf_bytes = download_pdf_from_url(pdf_url)
-            pdf_text = extract_text_from_pdf(pdf_bytes)
-        
-        # Check if file is uploaded
-        elif 'file' in request.files:
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({"error": "No file selected"}), 400
-            
-            if not file.filename.lower().endswith('.pdf'):
-                return jsonify({"error": "File must be a PDF"}), 400
-            
-            # Validate that it's a real PDF by checking magic bytes
-            file.seek(0)
-            header = file.read(5)
-            file.seek(0)  # Reset file pointer for later reading
-            
-            # PDF files must start with "%PDF-" (magic bytes)
-            if not header.startswith(b'%PDF-'):
-                return jsonify({"error": "Invalid PDF file. This may be a renamed file."}), 400
-            
-            print(f"📄 Processing uploaded file: {file.filename}")
-            pdf_text = extract_text_from_pdf(file)
-        
-        else:
-            return jsonify({"error": "No PDF file or URL provided"}), 400
-        
-        # Check if text was extracted
-        if not pdf_text or not pdf_text.strip():
-            return jsonify({"error": "Could not extract text from PDF"}), 400
-        
+        error = validate_summary_params(max_tokens, temperature, output_language)
+        if error:
+            return json_response({"error": error}, 400)
+
+        # Get PDF content (cached extraction when the document is known)
+        pdf_text, pdf_hash = await get_pdf_text_from_request(form, files)
+
+        # Re-submitting the same PDF with the same parameters skips the
+        # Gemini call entirely
+        summary_key = f"{pdf_hash}:{max_tokens}:{temperature}:{summary_style}:{output_language}:{structured}"
+        cached = summary_cache.get(summary_key)
+        if cached is not None:
+            print("⚡ Cache hit, returning stored summary")
+            summary, text_length = cached
+            return json_response({
+                "success": True,
+                "summary": summary,
+                "metadata": {
+                    "text_length": text_length,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                    "summary_style": summary_style,
+                    "output_language": output_language,
+                    "cached": True
+                }
+            })
+
         # Generate summary
         print(f"🤖 Generating summary (max_tokens={max_tokens}, style={summary_style}, language={output_language})...")
-        summary = summarize_text(
+        summary = await summarize_text(
             pdf_text,
             max_tokens=max_tokens,
             temperature=temperature,
             summary_style=summary_style,
-            output_language=output_language
+            output_language=output_language,
+            structured=structured
         )
-        
-        return jsonify({
+
+        summary_cache.set(summary_key, (summary, len(pdf_text)))
+
+        return json_response({
             "success": True,
             "summary": summary,
             "metadata": {
@@ -261,12 +650,66 @@ def summarize():
                 "output_language": output_language
             }
         })
-    
+
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return json_response({"error": str(e)}, 500)
+
+@app.route('/api/summarize/stream', methods=['POST'])
+async def summarize_stream():
+    """
+    Streaming variant of /api/summarize
+
+    Emits the summary as server-sent events while Gemini generates it, so
+    the client sees text immediately instead of after the full response.
+    The buffered JSON endpoint stays available at /api/summarize.
+    """
+    try:
+        form = await request.form
+        files = await request.files
+        max_tokens = int(form.get('max_tokens', 8192))
+        temperature = float(form.get('temperature', 0.7))
+        summary_style = form.get('summary_style', 'comprehensive')
+        output_language = form.get('output_language', 'auto')
+
+        error = validate_summary_params(max_tokens, temperature, output_language)
+        if error:
+            return json_response({"error": error}, 400)
+
+        pdf_text, pdf_hash = await get_pdf_text_from_request(form, files)
+
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
     except Exception as e:
         print(f"❌ Error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}, 500)
+
+    print(f"🤖 Streaming summary (max_tokens={max_tokens}, style={summary_style}, language={output_language})...")
+
+    async def event_stream():
+        try:
+            async for piece in stream_summary_text(
+                pdf_text,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                summary_style=summary_style,
+                output_language=output_language
+            ):
+                yield b"data: " + orjson.dumps({"text": piece}) + b"\n\n"
+            yield b"data: [DONE]\n\n"
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return app.response_class(event_stream(), mimetype="text/event-stream")
 
 if __name__ == '__main__':
+    # Dev server only; in production run:
+    #   hypercorn -w 4 -b 0.0.0.0:5000 backend.app:app
+    # Debug (verbose tracebacks, reloader) only outside production
+    debug = os.getenv("FLASK_ENV", "development") != "production"
     print("🚀 Starting PDF Summarizer Backend...")
     print("📍 Running on http://localhost:5000")
-    app.run(debug=True, port=5000)
+    app.run(debug=debug, port=5000)